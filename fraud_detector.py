@@ -1,68 +1,160 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+from sklearn.cluster import MiniBatchKMeans
 from sklearn.metrics import classification_report, confusion_matrix
 import xgboost as xgb
-import joblib
-import json
+from scipy.spatial.distance import cdist
+import math
 import os
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+CATEGORICAL_COLUMNS = ['merchant_category', 'transaction_type', 'device_type']
+# Cyclic encoding factors and the reference point for distance_from_center (NYC)
+_HOUR_ANGLE = 2 * math.pi / 24
+_DAY_ANGLE = 2 * math.pi / 7
+_CENTER_LAT, _CENTER_LNG = 40.7128, -74.0060
+
+NUMERIC_COLUMNS = [
+    'amount', 'hour', 'day_of_week', 'user_age', 'account_age_days', 'previous_fraud_count',
+    'location_lat', 'location_lng', 'is_weekend', 'is_holiday'
+]
+FEATURE_COLUMNS = [
+    'amount', 'amount_log', 'hour', 'day_of_week', 'merchant_category',
+    'transaction_type', 'user_age', 'account_age_days', 'previous_fraud_count',
+    'location_lat', 'location_lng', 'device_type', 'is_weekend', 'is_holiday',
+    'hour_sin', 'hour_cos', 'day_sin', 'day_cos', 'amount_per_age', 'distance_from_center'
+]
+_FEATURE_IDX = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+
+def _build_row(out, amount, hour, day_of_week, merchant_code, transaction_code, user_age,
+               account_age_days, previous_fraud_count, lat, lng, device_code,
+               is_weekend, is_holiday):
+    """Write one transaction's features into ``out`` in FEATURE_COLUMNS order"""
+    out[0] = amount
+    out[1] = math.log1p(amount)
+    out[2] = hour
+    out[3] = day_of_week
+    out[4] = merchant_code
+    out[5] = transaction_code
+    out[6] = user_age
+    out[7] = account_age_days
+    out[8] = previous_fraud_count
+    out[9] = lat
+    out[10] = lng
+    out[11] = device_code
+    out[12] = is_weekend
+    out[13] = is_holiday
+    hr = hour * _HOUR_ANGLE
+    out[14] = math.sin(hr)
+    out[15] = math.cos(hr)
+    dr = day_of_week * _DAY_ANGLE
+    out[16] = math.sin(dr)
+    out[17] = math.cos(dr)
+    out[18] = amount / (user_age + 1)
+    out[19] = math.hypot(lat - _CENTER_LAT, lng - _CENTER_LNG)
+
+_build_row_jit = None
+
+def _jit_build_row():
+    """Return _build_row compiled with numba, importing numba only on first use"""
+    global _build_row_jit
+    if _build_row_jit is None:
+        try:
+            from numba import njit
+        except ImportError as e:
+            raise ImportError("use_jit=True requires numba (pip install numba)") from e
+        _build_row_jit = njit(cache=True)(_build_row)
+    return _build_row_jit
+
+def _xgb_training_device():
+    """Return 'cuda' when XGBoost is built with CUDA and cupy sees at least one GPU, else 'cpu'"""
+    if not xgb.build_info().get('USE_CUDA'):
+        return 'cpu'
+    try:
+        import cupy
+        if cupy.cuda.runtime.getDeviceCount() > 0:
+            return 'cuda'
+    except Exception:
+        pass
+    return 'cpu'
+
 class FraudDetector:
-    def __init__(self, model_path='./models/'):
+    def __init__(self, model_path='./models/', serving_mode=False, use_jit=False):
         self.model_path = model_path
+        self.serving_mode = serving_mode
+        # numba JIT only pays off in long-lived processes; per-request
+        # processes would spend more on importing numba than they save
+        self._build_row = _jit_build_row() if use_jit else _build_row
         self.xgb_model = None
+        self._booster = None
         self.kmeans_model = None
         self.scaler = StandardScaler()
-        self.label_encoders = {}
+        self._cats = {}
+        self._mean = None
+        self._scale = None
+        self._centers = None
         self.feature_columns = []
+        self._cat_codes = {}
+        self._eff_centers = None
+        self._inv_scale_sq = None
+        self._anomaly_threshold = None
+        self._max_anomaly_dist = None
+        self._inv_max_dist = None
         self.is_trained = False
         
         # Ensure model directory exists
         os.makedirs(model_path, exist_ok=True)
         
-    def generate_synthetic_data(self, n_samples=10000):
-        """Generate synthetic transaction data for training"""
-        np.random.seed(42)
+    def generate_synthetic_data(self, n_samples=10000, rng=None):
+        """Generate synthetic transaction data for training
+        
+        Pass a numpy Generator as ``rng`` to draw from an independent stream
+        (e.g. one from ``rng.spawn(n)``); defaults to a PCG64 seeded with 42.
+        """
+        if rng is None:
+            rng = np.random.default_rng(42)
         
         # Generate base transaction data
         data = {
-            'amount': np.random.lognormal(4, 1.5, n_samples),
-            'hour': np.random.randint(0, 24, n_samples),
-            'day_of_week': np.random.randint(0, 7, n_samples),
-            'merchant_category': np.random.choice([
+            'amount': rng.lognormal(4, 1.5, n_samples),
+            'hour': rng.integers(0, 24, n_samples),
+            'day_of_week': rng.integers(0, 7, n_samples),
+            'merchant_category': rng.choice([
                 'grocery', 'gas_station', 'restaurant', 'online_shopping',
                 'pharmacy', 'entertainment', 'travel', 'utilities'
             ], n_samples),
-            'transaction_type': np.random.choice([
+            'transaction_type': rng.choice([
                 'debit', 'credit', 'atm', 'online', 'mobile'
             ], n_samples),
-            'user_age': np.random.randint(18, 80, n_samples),
-            'account_age_days': np.random.randint(1, 3650, n_samples),
-            'previous_fraud_count': np.random.poisson(0.1, n_samples),
-            'location_lat': np.random.normal(40.7128, 0.1, n_samples),
-            'location_lng': np.random.normal(-74.0060, 0.1, n_samples),
-            'device_type': np.random.choice(['mobile', 'desktop', 'tablet'], n_samples),
-            'is_weekend': np.random.choice([0, 1], n_samples, p=[0.7, 0.3]),
-            'is_holiday': np.random.choice([0, 1], n_samples, p=[0.95, 0.05])
+            'user_age': rng.integers(18, 80, n_samples),
+            'account_age_days': rng.integers(1, 3650, n_samples),
+            'previous_fraud_count': rng.poisson(0.1, n_samples),
+            'location_lat': rng.normal(40.7128, 0.1, n_samples),
+            'location_lng': rng.normal(-74.0060, 0.1, n_samples),
+            'device_type': rng.choice(['mobile', 'desktop', 'tablet'], n_samples),
+            'is_weekend': rng.choice([0, 1], n_samples, p=[0.7, 0.3]),
+            'is_holiday': rng.choice([0, 1], n_samples, p=[0.95, 0.05])
         }
         
         df = pd.DataFrame(data)
         
         # Create fraud patterns
-        fraud_conditions = (
-            (df['amount'] > df['amount'].quantile(0.95)) |  # High amount
-            (df['hour'].isin([2, 3, 4, 5])) |  # Unusual hours
-            (df['merchant_category'] == 'online_shopping') & (df['amount'] > 1000) |  # High online
-            (df['previous_fraud_count'] > 0) & (df['amount'] > 500) |  # Previous fraud + high amount
-            (df['is_holiday'] == 1) & (df['amount'] > 2000)  # Holiday + high amount
-        )
-        
-        df['is_fraud'] = fraud_conditions.astype(int)
+        amount = df['amount'].to_numpy(copy=False)
+        hour = df['hour'].to_numpy(copy=False)
+        q95 = np.quantile(amount, 0.95)
+        fraud_conditions = np.logical_or.reduce((
+            amount > q95,  # High amount
+            (hour >= 2) & (hour <= 5),  # Unusual hours
+            (df['merchant_category'].to_numpy(copy=False) == 'online_shopping') & (amount > 1000),  # High online
+            (df['previous_fraud_count'].to_numpy(copy=False) > 0) & (amount > 500),  # Previous fraud + high amount
+            (df['is_holiday'].to_numpy(copy=False) == 1) & (amount > 2000)  # Holiday + high amount
+        ))
+        
+        df['is_fraud'] = fraud_conditions.view(np.int8)
         
         # Add some noise to make it more realistic
         fraud_rate = df['is_fraud'].mean()
@@ -71,41 +163,42 @@ class FraudDetector:
         return df
     
     def prepare_features(self, df):
-        """Prepare features for ML models"""
-        df = df.copy()
-        
-        # Encode categorical variables
-        categorical_columns = ['merchant_category', 'transaction_type', 'device_type']
-        for col in categorical_columns:
-            if col not in self.label_encoders:
-                self.label_encoders[col] = LabelEncoder()
-                df[col] = self.label_encoders[col].fit_transform(df[col].astype(str))
-            else:
-                df[col] = self.label_encoders[col].transform(df[col].astype(str))
-        
-        # Create additional features
-        df['amount_log'] = np.log1p(df['amount'])
-        df['amount_per_age'] = df['amount'] / (df['user_age'] + 1)
-        df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
-        df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
-        df['day_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-        df['day_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
+        """Prepare features for ML models as a float32 matrix in FEATURE_COLUMNS order
+        
+        The input DataFrame is only read, never copied or modified.
+        """
+        self.feature_columns = list(FEATURE_COLUMNS)
+        X = np.empty((len(df), len(FEATURE_COLUMNS)), dtype=np.float32)
+        
+        for col in NUMERIC_COLUMNS:
+            X[:, _FEATURE_IDX[col]] = df[col].to_numpy()
+        
+        # Encode categorical variables (unseen categories map to -1)
+        for col in CATEGORICAL_COLUMNS:
+            X[:, _FEATURE_IDX[col]] = pd.Categorical(df[col], categories=self._cats[col]).codes
+        
+        # Create additional features. They are computed in float64 from the raw
+        # columns and rounded once on store, exactly like _build_row, so single and
+        # batch scoring see identical feature values
+        amount = df['amount'].to_numpy(dtype=np.float64)
+        np.log1p(amount, out=X[:, _FEATURE_IDX['amount_log']])
+        np.divide(amount, df['user_age'].to_numpy(dtype=np.float64) + 1, out=X[:, _FEATURE_IDX['amount_per_age']])
+        
+        hr = df['hour'].to_numpy(dtype=np.float64) * _HOUR_ANGLE
+        np.sin(hr, out=X[:, _FEATURE_IDX['hour_sin']])
+        np.cos(hr, out=X[:, _FEATURE_IDX['hour_cos']])
+        day = df['day_of_week'].to_numpy(dtype=np.float64) * _DAY_ANGLE
+        np.sin(day, out=X[:, _FEATURE_IDX['day_sin']])
+        np.cos(day, out=X[:, _FEATURE_IDX['day_cos']])
         
         # Distance from center (assuming NYC as center)
-        center_lat, center_lng = 40.7128, -74.0060
-        df['distance_from_center'] = np.sqrt(
-            (df['location_lat'] - center_lat)**2 + (df['location_lng'] - center_lng)**2
+        np.hypot(
+            df['location_lat'].to_numpy(dtype=np.float64) - _CENTER_LAT,
+            df['location_lng'].to_numpy(dtype=np.float64) - _CENTER_LNG,
+            out=X[:, _FEATURE_IDX['distance_from_center']]
         )
         
-        # Select features for training
-        self.feature_columns = [
-            'amount', 'amount_log', 'hour', 'day_of_week', 'merchant_category',
-            'transaction_type', 'user_age', 'account_age_days', 'previous_fraud_count',
-            'location_lat', 'location_lng', 'device_type', 'is_weekend', 'is_holiday',
-            'hour_sin', 'hour_cos', 'day_sin', 'day_cos', 'amount_per_age', 'distance_from_center'
-        ]
-        
-        return df[self.feature_columns]
+        return X
     
     def train_models(self, df=None):
         """Train XGBoost and KMeans models"""
@@ -114,6 +207,9 @@ class FraudDetector:
         
         print("🔄 Training fraud detection models...")
         
+        # Learn categorical vocabularies
+        self._cats = {col: df[col].astype('category').cat.categories for col in CATEGORICAL_COLUMNS}
+        
         # Prepare features
         X = self.prepare_features(df)
         y = df['is_fraud']
@@ -136,24 +232,52 @@ class FraudDetector:
             subsample=0.8,
             colsample_bytree=0.8,
             random_state=42,
-            eval_metric='logloss'
+            eval_metric='logloss',
+            tree_method='hist',
+            device=_xgb_training_device(),
+            n_jobs=-1
         )
         
         self.xgb_model.fit(X_train, y_train)
+        # Inference runs on host numpy arrays, so keep the fitted booster on the CPU
+        self.xgb_model.set_params(device='cpu')
         
         # Train KMeans for anomaly detection
         print("🔍 Training KMeans anomaly detector...")
         # Use only non-fraud data for clustering
         non_fraud_data = X_train_scaled[y_train == 0]
-        self.kmeans_model = KMeans(n_clusters=5, random_state=42, n_init=10)
+        self.kmeans_model = MiniBatchKMeans(
+            n_clusters=5,
+            batch_size=1024,
+            n_init=3,
+            max_no_improvement=20,
+            random_state=42
+        )
         self.kmeans_model.fit(non_fraud_data)
         
+        # Scaler statistics and centers are stored as float32 to halve the artifact
+        # size; the distance computations themselves run in float64
+        self._mean = self.scaler.mean_.astype(np.float32)
+        self._scale = self.scaler.scale_.astype(np.float32)
+        self._centers = self.kmeans_model.cluster_centers_.astype(np.float32)
+        
+        # Anomaly threshold and normalisation constant from the training distances
+        train_distances = np.sqrt(
+            cdist(X_train_scaled, self._centers, 'sqeuclidean').min(axis=1)
+        )
+        self._anomaly_threshold = float(np.percentile(train_distances, 95))
+        self._max_anomaly_dist = float(train_distances.max())
+        self._inv_max_dist = 1.0 / self._max_anomaly_dist
+        
         # Evaluate models
         self.evaluate_models(X_test, y_test, X_test_scaled)
         
         # Save models
         self.save_models()
         
+        self._init_inference_constants()
+        if self.serving_mode:
+            self.configure_for_serving()
         self.is_trained = True
         print("✅ Models trained and saved successfully!")
         
@@ -173,91 +297,198 @@ class FraudDetector:
         print(classification_report(y_test, y_pred_xgb))
         
         # KMeans anomaly detection
-        distances = self.kmeans_model.transform(X_test_scaled)
-        min_distances = np.min(distances, axis=1)
+        min_distances = np.sqrt(
+            cdist(X_test_scaled, self._centers, 'sqeuclidean').min(axis=1)
+        )
         
-        # Use 95th percentile as threshold for anomalies
-        threshold = np.percentile(min_distances, 95)
-        y_pred_kmeans = (min_distances > threshold).astype(int)
+        # Same rule as predict_fraud: the cached training-set 95th-percentile threshold
+        y_pred_kmeans = (min_distances > self._anomaly_threshold).astype(int)
         
         print("\n🔍 KMeans Anomaly Detection Performance:")
         print(classification_report(y_test, y_pred_kmeans))
         
-        # Combined model (ensemble)
-        combined_score = (y_prob_xgb + (min_distances / np.max(min_distances))) / 2
-        y_pred_combined = (combined_score > 0.5).astype(int)
+        # Combined model (ensemble), normalised by the training max exactly as in
+        # predict_fraud: mean score > 0.5 <=> prob + dist / max_dist > 1
+        combined = y_prob_xgb + min_distances * self._inv_max_dist
+        y_pred_combined = (combined > 1.0).astype(int)
         
         print("\n🎯 Combined Model Performance:")
         print(classification_report(y_test, y_pred_combined))
     
+    def _init_inference_constants(self):
+        """Precompute category lookups and center constants for single-transaction scoring"""
+        self._booster = self.xgb_model.get_booster()
+        self._cat_codes = {col: {v: i for i, v in enumerate(cats)} for col, cats in self._cats.items()}
+        
+        # KMeans centers mapped back to unscaled feature space, so the anomaly
+        # distance can be taken without materialising the scaled features
+        # (in float64: unscaled features like amount would lose precision in float32)
+        scale = self._scale.astype(np.float64)
+        self._eff_centers = self._centers * scale + self._mean
+        self._inv_scale_sq = 1.0 / scale**2
+    
+    def _anomaly_distances(self, X):
+        """Distance from an unscaled single feature row to its nearest KMeans center in scaled space"""
+        diff = X[:, None, :] - self._eff_centers[None, :, :]
+        d2 = np.einsum('nkd,nkd,d->nk', diff, diff, self._inv_scale_sq)
+        return np.sqrt(d2.min(axis=1))
+    
+    def configure_for_serving(self):
+        """Restrict inference to a single thread per process
+        
+        Intended for deployment behind a multi-worker server (gunicorn/uvicorn):
+        run N worker processes with one thread each rather than one process
+        with N threads. OMP_NUM_THREADS only affects OpenMP runtimes started
+        after this call, so also set it in the worker environment.
+        """
+        if self.xgb_model is None:
+            raise RuntimeError("No XGBoost model to configure; train or load the models first")
+        
+        os.environ['OMP_NUM_THREADS'] = '1'
+        self.xgb_model.set_params(n_jobs=1)
+        self._booster = self.xgb_model.get_booster()
+        self._booster.set_param({'nthread': 1})
+    
+    def _fill_row(self, transaction):
+        """Build the (1, n_features) float32 feature row for one transaction
+        
+        A fresh row is allocated per call so concurrent callers never share state.
+        """
+        codes = self._cat_codes
+        row = np.empty((1, len(FEATURE_COLUMNS)), dtype=np.float32)
+        self._build_row(
+            row[0],
+            float(transaction['amount']),
+            float(transaction['hour']),
+            float(transaction['day_of_week']),
+            float(codes['merchant_category'].get(transaction['merchant_category'], -1)),
+            float(codes['transaction_type'].get(transaction['transaction_type'], -1)),
+            float(transaction['user_age']),
+            float(transaction['account_age_days']),
+            float(transaction['previous_fraud_count']),
+            float(transaction['location_lat']),
+            float(transaction['location_lng']),
+            float(codes['device_type'].get(transaction['device_type'], -1)),
+            float(transaction['is_weekend']),
+            float(transaction['is_holiday'])
+        )
+        
+        return row
+    
     def predict_fraud(self, transaction_data):
         """Predict fraud for a single transaction"""
         if not self.is_trained:
             self.load_models()
         
-        # Convert to DataFrame
-        if isinstance(transaction_data, dict):
-            df = pd.DataFrame([transaction_data])
-        else:
-            df = pd.DataFrame(transaction_data)
+        # Anything other than a single dict goes through the batch scorer
+        if not isinstance(transaction_data, dict):
+            return self._score_matrix(self.prepare_features(pd.DataFrame(transaction_data)))[0]
         
-        # Prepare features
-        X = self.prepare_features(df)
+        # Single transactions skip the DataFrame round-trip
+        X = self._fill_row(transaction_data)
         
         # XGBoost prediction
-        xgb_prob = self.xgb_model.predict_proba(X)[:, 1]
+        xgb_prob = self._booster.inplace_predict(X)
         
         # KMeans anomaly detection
-        X_scaled = self.scaler.transform(X)
-        distances = self.kmeans_model.transform(X_scaled)
-        min_distances = np.min(distances, axis=1)
-        threshold = np.percentile(min_distances, 95)
-        kmeans_anomaly = (min_distances > threshold).astype(int)
+        min_distances = self._anomaly_distances(X)
+        kmeans_anomaly = (min_distances > self._anomaly_threshold).astype(int)
         
-        # Combined score
-        combined_score = (xgb_prob + (min_distances / np.max(min_distances))) / 2
+        # Combined score (sum of the two components; the reported score is their mean)
+        combined = float(xgb_prob[0] + min_distances[0] * self._inv_max_dist)
         
         return {
-            'is_fraud': int(combined_score[0] > 0.5),
-            'fraud_score': float(combined_score[0]),
+            'is_fraud': int(combined > 1.0),
+            'fraud_score': combined * 0.5,
             'xgb_probability': float(xgb_prob[0]),
             'kmeans_anomaly': int(kmeans_anomaly[0]),
             'anomaly_distance': float(min_distances[0]),
-            'confidence': float(abs(combined_score[0] - 0.5) * 2)
+            'confidence': abs(combined - 1.0)
         }
     
+    def predict_fraud_batch(self, records):
+        """Predict fraud for a list of transactions in one vectorized pass"""
+        if not self.is_trained:
+            self.load_models()
+        
+        if len(records) == 0:
+            return []
+        
+        # Prepare features as one contiguous float32 matrix
+        return self._score_matrix(self.prepare_features(pd.DataFrame.from_records(records)))
+    
+    def _score_matrix(self, X):
+        """Score a prepared feature matrix, returning one result dict per row"""
+        # XGBoost prediction
+        xgb_prob = self._booster.inplace_predict(X)
+        
+        # KMeans anomaly detection (scaled straight to float64, which cdist works in)
+        X_scaled = np.subtract(X, self._mean, dtype=np.float64)
+        X_scaled /= self._scale
+        min_distances = np.sqrt(
+            cdist(X_scaled, self._centers, 'sqeuclidean').min(axis=1)
+        )
+        kmeans_anomaly = min_distances > self._anomaly_threshold
+        
+        # Combined score (sum of the two components; the reported score is their mean)
+        combined = xgb_prob + min_distances * self._inv_max_dist
+        
+        return [
+            {
+                'is_fraud': int(total > 1.0),
+                'fraud_score': total * 0.5,
+                'xgb_probability': prob,
+                'kmeans_anomaly': int(anomaly),
+                'anomaly_distance': dist,
+                'confidence': abs(total - 1.0)
+            }
+            for total, prob, anomaly, dist in zip(
+                combined.tolist(), xgb_prob.tolist(), kmeans_anomaly.tolist(), min_distances.tolist()
+            )
+        ]
+    
     def save_models(self):
         """Save trained models"""
-        model_files = {
-            'xgb_model.pkl': self.xgb_model,
-            'kmeans_model.pkl': self.kmeans_model,
-            'scaler.pkl': self.scaler,
-            'label_encoders.pkl': self.label_encoders,
-            'feature_columns.json': self.feature_columns
-        }
-        
-        for filename, model in model_files.items():
-            filepath = os.path.join(self.model_path, filename)
-            if filename.endswith('.json'):
-                with open(filepath, 'w') as f:
-                    json.dump(model, f)
-            else:
-                joblib.dump(model, filepath)
+        # XGBoost uses its native UBJ format (sklearn metadata is embedded)
+        self.xgb_model.save_model(os.path.join(self.model_path, 'xgb.ubj'))
+        
+        # Everything else inference needs goes into a single array archive
+        np.savez_compressed(
+            os.path.join(self.model_path, 'inference_stats.npz'),
+            mean=self._mean,
+            scale=self._scale,
+            centers=self._centers,
+            threshold=self._anomaly_threshold,
+            max_dist=self._max_anomaly_dist,
+            feature_columns=np.array(self.feature_columns),
+            **{f'cat_{col}': np.array(cats, dtype=str) for col, cats in self._cats.items()}
+        )
         
         print(f"💾 Models saved to {self.model_path}")
     
     def load_models(self):
         """Load pre-trained models"""
         try:
-            self.xgb_model = joblib.load(os.path.join(self.model_path, 'xgb_model.pkl'))
-            self.kmeans_model = joblib.load(os.path.join(self.model_path, 'kmeans_model.pkl'))
-            self.scaler = joblib.load(os.path.join(self.model_path, 'scaler.pkl'))
-            self.label_encoders = joblib.load(os.path.join(self.model_path, 'label_encoders.pkl'))
+            self.xgb_model = xgb.XGBClassifier()
+            self.xgb_model.load_model(os.path.join(self.model_path, 'xgb.ubj'))
             
-            with open(os.path.join(self.model_path, 'feature_columns.json'), 'r') as f:
-                self.feature_columns = json.load(f)
+            with np.load(os.path.join(self.model_path, 'inference_stats.npz')) as stats:
+                self._mean = stats['mean']
+                self._scale = stats['scale']
+                self._centers = stats['centers']
+                self._anomaly_threshold = float(stats['threshold'])
+                self._max_anomaly_dist = float(stats['max_dist'])
+                self._inv_max_dist = 1.0 / self._max_anomaly_dist
+                saved_columns = stats['feature_columns'].tolist()
+                if saved_columns != FEATURE_COLUMNS:
+                    raise ValueError("Saved feature columns do not match FEATURE_COLUMNS; retrain the models")
+                self.feature_columns = saved_columns
+                self._cats = {col: pd.Index(stats[f'cat_{col}'].tolist()) for col in CATEGORICAL_COLUMNS}
             
             self.is_trained = True
+            self._init_inference_constants()
+            if self.serving_mode:
+                self.configure_for_serving()
             print("✅ Models loaded successfully!")
             return True
         except Exception as e:
@@ -270,10 +501,9 @@ class FraudDetector:
             self.load_models()
         
         importance = self.xgb_model.feature_importances_
-        feature_importance = list(zip(self.feature_columns, importance))
-        feature_importance.sort(key=lambda x: x[1], reverse=True)
+        order = np.argsort(-importance, kind='stable')
         
-        return feature_importance
+        return [(self.feature_columns[i], float(importance[i])) for i in order]
 
 # Example usage and training
 if __name__ == "__main__":